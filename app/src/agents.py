@@ -3,6 +3,10 @@ from crewai import Agent
 from streamlitHelpers import create_streamlit_callback
 from tools import * 
 from langchain_groq import ChatGroq
+from router import ModelRouter
+from sandbox import code_execution_enabled
+from typing import Optional, Union
+import pandas as pd
 
 agent_emojis = {
     "Problem_Definition_Agent": "🔍",
@@ -13,24 +17,50 @@ agent_emojis = {
     "Summarization_Agent": "📝"
 }
 
-def initialize_agents(llm : ChatGroq ) -> dict:
+def initialize_agents(
+    llm : Union[ChatGroq, ModelRouter] ,
+    headless: bool = False,
+    df: Optional[pd.DataFrame] = None,
+    file_name: str = "data.csv"
+    ) -> dict:
     """
     Initialize and configure the agents for ML.Guide.
 
     Args:
-        llm: The llm client to be used by the agents.
+        llm: The llm client to be used by the agents, or a ModelRouter choosing one per agent.
+        headless (bool): If True, the agents are created without Streamlit step callbacks,
+            for runs outside of the Streamlit app. Default is False.
+        df (pd.DataFrame, optional): The user's data. When given, the Model_Recommendation_Agent
+            can benchmark baseline models on it and, if `MLGUIDE_CODE_EXECUTION` is set, the
+            Machine_Learning_Engineer can run and profile its code against it.
+        file_name (str): The name of the user's data file, under which generated code can read
+            the data in the sandbox. Default is "data.csv".
 
     Returns:
         dict: A dictionary containing the initialized agents.
     """
+    def step_callback(agent_role: str):
+        if headless:
+            return None
+        return create_streamlit_callback(agent_role, agent_emojis[agent_role])
+
+    def agent_llm(agent_role: str):
+        if isinstance(llm, ModelRouter):
+            return llm.for_agent(agent_role)
+        return llm
+
+    data_tools = [make_benchmark_tool(df)] if df is not None else []
+    # Generated code runs unconfined on the host, so executing it must be opted into.
+    code_tools = [make_code_execution_tool(df, file_name)] if df is not None and code_execution_enabled() else []
+
     Problem_Definition_Agent = Agent(
         role='Problem_Definition_Agent',
         goal="""Clarify the machine learning problem the user wants to solve, identifying the type of problem (e.g., classification, regression) and any specific requirements.""",
         backstory="""You are an expert in understanding and defining machine learning problems. Your goal is to extract a clear, concise problem statement from the user's input, ensuring the project starts with a solid foundation.""",
         verbose=True,
         allow_delegation=False,
-        llm=llm,
-        step_callback=create_streamlit_callback('Problem_Definition_Agent', agent_emojis['Problem_Definition_Agent'])
+        llm=agent_llm('Problem_Definition_Agent'),
+        step_callback=step_callback('Problem_Definition_Agent')
     )
 
     Data_Assessment_Agent = Agent(
@@ -39,8 +69,8 @@ def initialize_agents(llm : ChatGroq ) -> dict:
         backstory="""You specialize in data statistical evaluation and preprocessing. Your task is to guide the user in preparing their dataset for the machine learning model, including suggestions for data cleaning and augmentation.""",
         verbose=True,
         allow_delegation=False,
-        llm=llm,
-        step_callback=create_streamlit_callback('Data_Assessment_Agent', agent_emojis['Data_Assessment_Agent'])
+        llm=agent_llm('Data_Assessment_Agent'),
+        step_callback=step_callback('Data_Assessment_Agent')
     )
 
 
@@ -51,10 +81,10 @@ def initialize_agents(llm : ChatGroq ) -> dict:
         backstory="""You are an expert in machine learning model selection, capable of evaluating various models' strengths and weaknesses to provide the best recommendation for a given problem.""",
         verbose=True,
         allow_delegation=False,
-        llm=llm,
+        llm=agent_llm('Model_Recommendation_Agent'),
         # Add Arxiv Tool tools = 
-        tools = [search_arxiv , perform_web_search],
-        step_callback=create_streamlit_callback('Model_Recommendation_Agent', agent_emojis['Model_Recommendation_Agent'])
+        tools = [search_arxiv , perform_web_search] + data_tools,
+        step_callback=step_callback('Model_Recommendation_Agent')
     )
 
     Researcher = Agent(
@@ -63,9 +93,9 @@ def initialize_agents(llm : ChatGroq ) -> dict:
         backstory="""You are a seasoned researcher, adept at finding and synthesizing information from a wide range of sources to support the team's objectives.""",
         verbose=True,
         allow_delegation=False,
-        llm=llm,
+        llm=agent_llm('Researcher'),
         tools = [perform_web_search , search_arxiv], 
-        step_callback=create_streamlit_callback('Researcher', agent_emojis['Researcher'])
+        step_callback=step_callback('Researcher')
     )
 
     Machine_Learning_Engineer = Agent(
@@ -74,8 +104,9 @@ def initialize_agents(llm : ChatGroq ) -> dict:
         backstory="""You are a code wizard, able to generate starter code templates that users can customize for their projects. Your goal is to give users a head start in their coding efforts.""",
         verbose=True,
         allow_delegation=False,
-        llm=llm,
-        step_callback=create_streamlit_callback('Machine_Learning_Engineer', agent_emojis['Machine_Learning_Engineer'])
+        llm=agent_llm('Machine_Learning_Engineer'),
+        tools = code_tools,
+        step_callback=step_callback('Machine_Learning_Engineer')
     )
 
     Summarization_Agent = Agent(
@@ -84,8 +115,8 @@ def initialize_agents(llm : ChatGroq ) -> dict:
         backstory="""You specialize in distilling large volumes of information into clear and actionable summaries, helping the team stay focused on key insights.""",
         verbose=True,
         allow_delegation=False,
-        llm=llm,
-        step_callback=create_streamlit_callback('Summarization_Agent', agent_emojis['Summarization_Agent'])
+        llm=agent_llm('Summarization_Agent'),
+        step_callback=step_callback('Summarization_Agent')
     )
 
     return {
@@ -5,6 +5,8 @@ from crewai import Crew, Process
 from langchain_groq import ChatGroq
 from tasks import setup_tasks
 from agents import initialize_agents
+from router import ModelRouter
+from datacache import cache_csv, load_dataset
 from streamlitHelpers import create_sidebar, create_streamlit_UI
 from tools import *
 import streamlit.components.v1 as components  # Importing the components module
@@ -14,19 +16,23 @@ import sweetviz as sv
 st.set_page_config(layout="wide")
 
 
-def reports(df):
+def reports(df, report_path="data_assessment.html"):
+    if os.path.exists(report_path):  # The report of a cached dataset is generated only once
+        return
     report = sv.analyze(df)
-    report.show_html("data_assessment.html", open_browser=False)
+    report.show_html(report_path, open_browser=False)
 
 
 def main():
 
-    # Initialize the language model
-    llm = ChatGroq(
-        temperature=0,
-        groq_api_key=os.getenv("GROQ_API_KEY"),
-        model_name=os.getenv("MODEL"),
-    )
+    # Initialize the language model, or a router assigning one per agent if MODEL_ROUTING is set
+    llm = ModelRouter.from_env(os.getenv("GROQ_API_KEY"), os.getenv("MODEL"))
+    if llm is None:
+        llm = ChatGroq(
+            temperature=0,
+            groq_api_key=os.getenv("GROQ_API_KEY"),
+            model_name=os.getenv("MODEL"),
+        )
     create_streamlit_UI(
         "Your Machine Learning Assistant",
         "Describe your machine learning problem and upload a CSV file with your data.",
@@ -41,11 +47,13 @@ def main():
 
     if user_question and uploaded_file:
 
-        df = pd.read_csv(uploaded_file)  # Read the CSV file into a DataFrame
-        agents = initialize_agents(llm)  # Initialize agents with the language model
-        reports(df)  # Display the HTML report
+        dataset_path = cache_csv(uploaded_file.getvalue())  # Parse the CSV once into the columnar cache
+        df = load_dataset(dataset_path)  # Private copy-on-write mapping; pages are shared with other sessions until written
+        agents = initialize_agents(llm, df=df, file_name=uploaded_file.name)  # Initialize agents with the language model
+        report_path = os.path.splitext(dataset_path)[0] + ".html"
+        reports(df, report_path)  # Display the HTML report
         with st.chat_message("Data_Assessment_Agent", avatar="📊"):
-            with open("data_assessment.html", "r") as f:
+            with open(report_path, "r") as f:
                 components.html(f.read(), height=800, scrolling=True)
         tasks = setup_tasks(
             agents, user_question, df, uploaded_file
@@ -61,6 +69,10 @@ def main():
 
         result = crew.kickoff()  # Execute the tasks
 
+        if isinstance(llm, ModelRouter):
+            with st.expander("Model usage"):
+                st.dataframe(pd.DataFrame.from_dict(llm.usage_log.summary(), orient="index"))
+
         # st.write(result)  # Output the result in Streamlit
 
 
@@ -0,0 +1,342 @@
+# batch.py
+"""
+Headless batch mode for ML.Guide.
+
+Runs the ML.Guide crew over a manifest of (problem statement, CSV path) pairs,
+several crews at a time, and writes every job's task outputs, plots and timings
+to a structured output directory:
+
+    <output_dir>/
+        summary.csv                 per-job status and timing summary
+        jobs/<job_id>/
+            problem.txt
+            tasks/01_<agent>.md     one file per task output
+            plots/                  images created by the plotting tools
+            result.json             status, timings and final output
+
+Jobs whose `result.json` already records a successful run are skipped, so an
+interrupted batch can simply be started again.
+
+Example:
+    python batch.py manifest.csv --output-dir guidance --workers 4
+"""
+import argparse
+import csv
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from crewai import Crew, Process
+from langchain_groq import ChatGroq
+
+from agents import initialize_agents
+from datacache import read_csv_cached
+from router import ModelRouter, ModelUsageLog
+from tasks import setup_tasks
+from tools import enable_response_cache, set_plots_dir
+
+SUMMARY_FIELDS = ["job_id", "status", "skipped", "seconds", "problem", "csv_path", "error"]
+
+
+@dataclass
+class BatchJob:
+    """
+    A single ML.Guide run: a problem statement and the CSV it applies to.
+
+    Attributes:
+        problem (str): The user's machine learning problem statement.
+        csv_path (str): Path to the CSV file with the data.
+        job_id (str): Name of the job's output directory.
+    """
+    problem: str
+    csv_path: str
+    job_id: str = ""
+
+    def __post_init__(self) -> None:
+        # Explicit ids are sanitized too, so "a/b" or "../x" cannot escape the output directory.
+        self.job_id = safe_job_id(self.job_id) if self.job_id else make_job_id(self.problem, self.csv_path)
+
+
+def make_job_id(problem: str, csv_path: str) -> str:
+    """
+    Builds a stable, filesystem-safe job identifier from a problem and its CSV path.
+
+    Args:
+        problem (str): The problem statement.
+        csv_path (str): The path to the CSV file.
+
+    Returns:
+        str: The CSV file stem followed by a short hash of the job's inputs.
+    """
+    digest = hashlib.sha1(f"{problem}\0{csv_path}".encode("utf-8")).hexdigest()[:10]
+    return f"{safe_job_id(Path(csv_path).stem)[:40]}-{digest}"
+
+
+def safe_job_id(job_id: str) -> str:
+    """
+    Makes a job identifier usable as a single directory name inside the output directory.
+
+    Args:
+        job_id (str): The identifier, e.g. an `id` from the manifest.
+
+    Returns:
+        str: The identifier with every run of characters other than letters, digits, "_" and "-" replaced by "_".
+    """
+    return re.sub(r"[^A-Za-z0-9_-]+", "_", job_id)
+
+
+def load_manifest(path: str) -> List[BatchJob]:
+    """
+    Loads batch jobs from a CSV, JSON Lines or JSON manifest.
+
+    Each record needs a `problem` and a `csv_path` field and may set an `id`, which is
+    sanitized with `safe_job_id`. Relative CSV paths are resolved against the manifest's directory.
+
+    Args:
+        path (str): Path to a `.csv`, `.jsonl` or `.json` (array of records) manifest.
+
+    Returns:
+        List[BatchJob]: The jobs in manifest order.
+
+    Raises:
+        ValueError: If a record is incomplete or two jobs share the same id.
+    """
+    manifest_path = Path(path)
+    suffix = manifest_path.suffix.lower()
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        if suffix == ".json":
+            records = json.load(f)
+            if not isinstance(records, list):
+                raise ValueError("A .json manifest must contain an array of job records.")
+        elif suffix == ".jsonl":
+            records = [json.loads(line) for line in f if line.strip()]
+        else:
+            records = list(csv.DictReader(f))
+
+    jobs = []
+    for number, record in enumerate(records, start=1):
+        if not record.get("problem") or not record.get("csv_path"):
+            raise ValueError(f"Manifest record {number} needs both 'problem' and 'csv_path'.")
+        csv_path = Path(record["csv_path"])
+        if not csv_path.is_absolute():
+            csv_path = manifest_path.parent / csv_path
+        jobs.append(BatchJob(record["problem"], str(csv_path), str(record.get("id") or "")))
+
+    seen = set()
+    for job in jobs:
+        if job.job_id in seen:
+            raise ValueError(f"Duplicate job id '{job.job_id}' in manifest; job ids must be unique.")
+        seen.add(job.job_id)
+    return jobs
+
+
+def _write_task_outputs(tasks: List[Any], tasks_dir: Path) -> List[Dict[str, Any]]:
+    """
+    Writes each completed task's output to its own Markdown file.
+
+    Args:
+        tasks (List[Any]): The executed crewAI tasks.
+        tasks_dir (Path): The directory to write the outputs into.
+
+    Returns:
+        List[Dict[str, Any]]: The agent role and output file of each task.
+    """
+    tasks_dir.mkdir(parents=True, exist_ok=True)
+    written = []
+    for number, task in enumerate(tasks, start=1):
+        if task.output is None:
+            continue
+        output = getattr(task.output, "raw_output", None) or str(task.output)
+        role = task.agent.role if task.agent else "task"
+        filename = f"{number:02d}_{role}.md"
+        (tasks_dir / filename).write_text(output, encoding="utf-8")
+        written.append({"agent": role, "file": f"tasks/{filename}"})
+    return written
+
+
+def run_job(
+    job: BatchJob,
+    output_dir: str,
+    model: str,
+    force: bool = False,
+    router: Optional[ModelRouter] = None,
+    ) -> Dict[str, Any]:
+    """
+    Runs the ML.Guide crew for one job and records its outputs.
+
+    Args:
+        job (BatchJob): The job to run.
+        output_dir (str): The batch output directory.
+        model (str): The Groq model name used by the agents.
+        force (bool): Re-run the job even if it already succeeded. Default is False.
+        router (ModelRouter, optional): Chooses a model per agent instead of using `model` for all.
+
+    Returns:
+        Dict[str, Any]: The job's summary row.
+    """
+    job_dir = Path(output_dir) / "jobs" / job.job_id
+    result_path = job_dir / "result.json"
+
+    if result_path.exists() and not force:
+        try:
+            with open(result_path, "r", encoding="utf-8") as f:
+                previous = json.load(f)
+        except (OSError, ValueError) as e:
+            # E.g. left truncated by an older version killed mid-write; run the job again.
+            logging.warning(f"Ignoring unreadable {result_path}: {e}")
+            previous = {}
+        if isinstance(previous, dict) and previous.get("status") == "ok":
+            return {**previous, "skipped": True}
+
+    job_dir.mkdir(parents=True, exist_ok=True)
+    (job_dir / "problem.txt").write_text(job.problem, encoding="utf-8")
+    set_plots_dir(str(job_dir / "plots"))
+
+    result: Dict[str, Any] = {
+        "job_id": job.job_id,
+        "problem": job.problem,
+        "csv_path": job.csv_path,
+        "skipped": False,
+    }
+    start = time.perf_counter()
+    try:
+        with open(job.csv_path, "rb") as f:
+            df = read_csv_cached(f.read())
+        llm = router or ChatGroq(
+            temperature=0,
+            groq_api_key=os.getenv("GROQ_API_KEY"),
+            model_name=model,
+        )
+        agents = initialize_agents(llm, headless=True, df=df, file_name=Path(job.csv_path).name)
+        tasks = setup_tasks(agents, job.problem, df, Path(job.csv_path))
+
+        task_seconds: List[float] = []
+        task_start = [time.perf_counter()]
+
+        def record_task_time(_output: Any) -> None:
+            now = time.perf_counter()
+            task_seconds.append(round(now - task_start[0], 3))
+            task_start[0] = now
+
+        for task in tasks:
+            task.callback = record_task_time
+
+        crew = Crew(
+            agents=list(agents.values()),
+            tasks=tasks,
+            process=Process.sequential,
+            full_output=True,
+        )
+        crew_output = crew.kickoff()
+
+        task_files = _write_task_outputs(tasks, job_dir / "tasks")
+        for entry, seconds in zip(task_files, task_seconds):
+            entry["seconds"] = seconds
+        final_output = crew_output.get("final_output") if isinstance(crew_output, dict) else crew_output
+        result.update(status="ok", error="", tasks=task_files, final_output=str(final_output))
+    except Exception as e:
+        logging.error(f"Batch job {job.job_id} failed: {e}")
+        result.update(status="error", error=str(e), traceback=traceback.format_exc())
+    result["seconds"] = round(time.perf_counter() - start, 3)
+
+    # Written to a temporary file and renamed, so a killed batch never leaves a truncated result.
+    tmp_path = result_path.with_suffix(".json.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+    os.replace(tmp_path, result_path)
+    return result
+
+
+def run_batch(
+    jobs: List[BatchJob],
+    output_dir: str,
+    workers: int = 4,
+    model: Optional[str] = None,
+    force: bool = False,
+    routing: str = "off",
+    ) -> List[Dict[str, Any]]:
+    """
+    Runs many ML.Guide jobs concurrently and writes a per-job timing summary.
+
+    All crews share the tools' bounded web and arXiv response cache (see
+    `tools.enable_response_cache`). LLM responses are not cached: every job's
+    prompts differ, so such a cache would only grow.
+
+    Args:
+        jobs (List[BatchJob]): The jobs to run.
+        output_dir (str): The directory to write job outputs and `summary.csv` into.
+        workers (int): The number of crews to run at the same time. Default is 4.
+        model (str, optional): The Groq model name. Defaults to the `MODEL` environment variable.
+        force (bool): Re-run jobs that already succeeded. Default is False.
+        routing (str): "auto" or "fixed" to route models per agent (see router.ModelRouter),
+            with every call recorded in `model_usage.jsonl`; "off" to use `model` everywhere.
+            Default is "off".
+
+    Returns:
+        List[Dict[str, Any]]: One summary row per job, in manifest order.
+
+    Raises:
+        ValueError: If no model is given, or the routing configuration is invalid.
+    """
+    model = model or os.getenv("MODEL")
+    if not model:
+        raise ValueError("No model given: pass --model or set the MODEL environment variable.")
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    enable_response_cache()
+
+    router = None
+    if routing != "off":
+        usage_log = ModelUsageLog(str(Path(output_dir) / "model_usage.jsonl"))
+        router = ModelRouter(os.getenv("GROQ_API_KEY"), model, mode=routing, usage_log=usage_log)
+
+    results: Dict[str, Dict[str, Any]] = {}
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {executor.submit(run_job, job, output_dir, model, force, router): job for job in jobs}
+        for future in as_completed(futures):
+            job = futures[future]
+            result = future.result()
+            results[job.job_id] = result
+            state = "skipped" if result["skipped"] else result["status"]
+            logging.info(f"[{len(results)}/{len(jobs)}] {job.job_id}: {state} ({result['seconds']}s)")
+
+    ordered = [results[job.job_id] for job in jobs]
+    with open(Path(output_dir) / "summary.csv", "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=SUMMARY_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(ordered)
+    if router is not None:
+        with open(Path(output_dir) / "model_usage_summary.json", "w", encoding="utf-8") as f:
+            json.dump(router.usage_log.summary(), f, indent=2)
+    return ordered
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run ML.Guide over a manifest of problems and CSV files.")
+    parser.add_argument("manifest", help="CSV or JSON Lines file with 'problem', 'csv_path' and optional 'id' fields.")
+    parser.add_argument("--output-dir", default="mlguide_batch", help="Directory for job outputs and the summary.")
+    parser.add_argument("--workers", type=int, default=4, help="Number of crews to run concurrently.")
+    parser.add_argument("--model", default=None, help="Groq model name (defaults to the MODEL environment variable).")
+    parser.add_argument("--force", action="store_true", help="Re-run jobs that already completed successfully.")
+    parser.add_argument("--routing", choices=["off", "auto", "fixed"], default="off", help="Per-agent model routing mode.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    jobs = load_manifest(args.manifest)
+    results = run_batch(jobs, args.output_dir, args.workers, args.model, args.force, args.routing)
+
+    failed = [r for r in results if r["status"] != "ok"]
+    logging.info(f"{len(results) - len(failed)} of {len(results)} jobs succeeded.")
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
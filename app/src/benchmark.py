@@ -0,0 +1,293 @@
+# benchmark.py
+"""
+Quick baseline benchmarking of scikit-learn models on the user's data.
+
+Each candidate model is cross-validated on a stratified subsample in its own
+worker process, a few at a time, and terminated if it exceeds its time limit.
+The result is a compact table of fit time, prediction throughput and score.
+"""
+import multiprocessing
+import queue
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import HistGradientBoostingClassifier, HistGradientBoostingRegressor
+from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+from sklearn.linear_model import LogisticRegression, Ridge
+from sklearn.model_selection import KFold, StratifiedKFold, cross_validate, train_test_split
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+from sklearn.tree import DecisionTreeClassifier, DecisionTreeRegressor
+
+# Unique target values up to which an integer or categorical target is treated as classification.
+MAX_CLASSES = 20
+# Categorical columns with more distinct values than this are dropped rather than one-hot encoded.
+MAX_CATEGORIES = 30
+# Maximum length of an error message shown in the results table.
+MAX_ERROR_CHARS = 200
+
+# Workers are never forked from the caller: the app and batch mode run many threads, and a forked
+# child can inherit a lock another thread held and deadlock.
+_mp_context = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+if _mp_context.get_start_method() == "forkserver":
+    # Import scikit-learn once in the (single-threaded) fork server instead of in every worker.
+    _mp_context.set_forkserver_preload([__name__])
+
+
+def baseline_models(task_type: str) -> Dict[str, Any]:
+    """
+    Returns the lightweight baseline models for a task type.
+
+    Args:
+        task_type (str): "classification" or "regression".
+
+    Returns:
+        Dict[str, Any]: Unfitted scikit-learn estimators by display name.
+    """
+    if task_type == "classification":
+        return {
+            "Logistic Regression": make_pipeline(StandardScaler(), LogisticRegression(max_iter=1000)),
+            "Decision Tree": DecisionTreeClassifier(max_depth=8),
+            "Random Forest": RandomForestClassifier(n_estimators=100, n_jobs=1),
+            "Hist Gradient Boosting": HistGradientBoostingClassifier(),
+        }
+    return {
+        "Ridge Regression": make_pipeline(StandardScaler(), Ridge()),
+        "Decision Tree": DecisionTreeRegressor(max_depth=8),
+        "Random Forest": RandomForestRegressor(n_estimators=100, n_jobs=1),
+        "Hist Gradient Boosting": HistGradientBoostingRegressor(),
+    }
+
+
+def infer_task_type(target: pd.Series) -> str:
+    """
+    Guesses whether a target column calls for classification or regression.
+
+    Args:
+        target (pd.Series): The target column.
+
+    Returns:
+        str: "classification" or "regression".
+    """
+    if pd.api.types.is_float_dtype(target) or (
+        pd.api.types.is_numeric_dtype(target) and target.nunique() > MAX_CLASSES
+    ):
+        return "regression"
+    return "classification"
+
+
+def prepare_features(
+    df: pd.DataFrame,
+    target_column: str,
+    task_type: str,
+    max_rows: int = 5000,
+    random_state: int = 0,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Subsamples the data (stratified for classification) and encodes it into numeric arrays.
+
+    Args:
+        df (pd.DataFrame): The user's data.
+        target_column (str): The column to predict.
+        task_type (str): "classification" or "regression".
+        max_rows (int): The maximum number of rows to keep. Default is 5000.
+        random_state (int): Seed for the subsample. Default is 0.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The feature matrix and the target vector.
+    """
+    df = df.dropna(subset=[target_column])
+    if len(df) > max_rows:
+        stratify = None
+        if task_type == "classification" and df[target_column].value_counts().min() >= 2:
+            stratify = df[target_column]
+        df, _ = train_test_split(df, train_size=max_rows, stratify=stratify, random_state=random_state)
+
+    features = df.drop(columns=[target_column])
+    # Columns without any values or with a single value carry no signal and break imputation.
+    features = features.loc[:, features.nunique(dropna=True) > 1]
+    categorical = features.select_dtypes(exclude="number")
+    categorical = categorical.loc[:, categorical.nunique() <= MAX_CATEGORIES]
+    numeric = features.select_dtypes(include="number")
+    numeric = numeric.fillna(numeric.median())
+    parts = [numeric]
+    if categorical.shape[1] > 0:
+        parts.append(pd.get_dummies(categorical, dummy_na=True))
+    X = pd.concat(parts, axis=1)
+
+    y = df[target_column]
+    y = y.astype(str).to_numpy() if task_type == "classification" else y.to_numpy(dtype=float)
+    return X.to_numpy(dtype=float), y
+
+
+def _benchmark_worker(name: str, model: Any, X: np.ndarray, y: np.ndarray, task_type: str, folds: int, result_queue: Any) -> None:
+    """
+    Cross-validates one model and puts its measurements on the result queue.
+    """
+    try:
+        if task_type == "classification":
+            n_splits = max(2, min(folds, int(pd.Series(y).value_counts().min())))
+            cv = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=0)
+            scoring = "accuracy"
+        else:
+            cv = KFold(n_splits=folds, shuffle=True, random_state=0)
+            scoring = "r2"
+        scores = cross_validate(model, X, y, cv=cv, scoring=scoring)
+        rows_per_fold = len(y) / cv.get_n_splits()
+        result_queue.put({
+            "model": name,
+            "status": "ok",
+            "metric": scoring,
+            "score": float(np.mean(scores["test_score"])),
+            "score_std": float(np.std(scores["test_score"])),
+            "fit_seconds": float(np.mean(scores["fit_time"])),
+            "predict_rows_per_second": float(rows_per_fold / max(np.mean(scores["score_time"]), 1e-9)),
+        })
+    except Exception as e:
+        # scikit-learn joins the tracebacks of all failed fits; its last line names the actual error.
+        lines = [line.strip() for line in str(e).splitlines() if line.strip()]
+        result_queue.put({"model": name, "status": f"error: {lines[-1] if lines else type(e).__name__}"})
+
+
+def run_benchmarks(
+    X: np.ndarray,
+    y: np.ndarray,
+    task_type: str,
+    models: Optional[Dict[str, Any]] = None,
+    time_limit: float = 60,
+    max_workers: int = 4,
+    folds: int = 3,
+    ) -> List[Dict[str, Any]]:
+    """
+    Cross-validates models in parallel worker processes, each within a time limit.
+
+    Workers are started with the "forkserver" method ("spawn" where it is unavailable).
+
+    Args:
+        X (np.ndarray): The feature matrix.
+        y (np.ndarray): The target vector.
+        task_type (str): "classification" or "regression".
+        models (Dict[str, Any], optional): Estimators by name. Defaults to `baseline_models(task_type)`.
+        time_limit (float): Seconds each model may run before it is terminated. Default is 60.
+        max_workers (int): The number of models benchmarked at the same time. Default is 4.
+        folds (int): The number of cross-validation folds. Default is 3.
+
+    Returns:
+        List[Dict[str, Any]]: One result per model, in the order the models were given.
+    """
+    models = models if models is not None else baseline_models(task_type)
+    result_queue = _mp_context.Queue()
+    pending = list(models.items())
+    running: Dict[str, Tuple[Any, float]] = {}
+    results: Dict[str, Dict[str, Any]] = {}
+
+    while pending or running:
+        while pending and len(running) < max_workers:
+            name, model = pending.pop(0)
+            process = _mp_context.Process(
+                target=_benchmark_worker, args=(name, model, X, y, task_type, folds, result_queue), daemon=True
+            )
+            process.start()
+            running[name] = (process, time.monotonic())
+
+        try:
+            result = result_queue.get(timeout=0.2)
+            results[result["model"]] = result
+        except queue.Empty:
+            pass
+
+        for name, (process, started) in list(running.items()):
+            if name in results:
+                process.join()
+                del running[name]
+            elif time.monotonic() - started > time_limit:
+                process.terminate()
+                process.join()
+                results[name] = {"model": name, "status": f"timed out after {time_limit:g}s"}
+                del running[name]
+            elif not process.is_alive() and process.exitcode != 0:
+                results[name] = {"model": name, "status": f"crashed with exit code {process.exitcode}"}
+                del running[name]
+
+    return [results[name] for name in models]
+
+
+def _table_cell(text: str) -> str:
+    """
+    Makes text safe for a single Markdown table cell, truncating it to MAX_ERROR_CHARS.
+    """
+    text = " ".join(text.split())
+    if len(text) > MAX_ERROR_CHARS:
+        text = text[:MAX_ERROR_CHARS - 3] + "..."
+    return text.replace("|", "\\|")
+
+
+def format_results(results: List[Dict[str, Any]], n_rows: int, task_type: str) -> str:
+    """
+    Formats benchmark results as a Markdown table.
+
+    Args:
+        results (List[Dict[str, Any]]): The results from `run_benchmarks`.
+        n_rows (int): The number of rows the models were benchmarked on.
+        task_type (str): "classification" or "regression".
+
+    Returns:
+        str: A Markdown table with one row per model.
+    """
+    lines = [
+        f"Baselines for {task_type} on a {n_rows}-row subsample:",
+        "",
+        "| Model | CV score | Fit time (s) | Predict throughput (rows/s) | Status |",
+        "|-------|----------|--------------|-----------------------------|--------|",
+    ]
+    for result in results:
+        if result["status"] == "ok":
+            lines.append(
+                f"| {result['model']} | {result['metric']} {result['score']:.4f} ± {result['score_std']:.4f} "
+                f"| {result['fit_seconds']:.3f} | {result['predict_rows_per_second']:,.0f} | ok |"
+            )
+        else:
+            lines.append(f"| {result['model']} | - | - | - | {_table_cell(result['status'])} |")
+    return "\n".join(lines)
+
+
+def benchmark_dataframe(
+    df: pd.DataFrame,
+    target_column: str,
+    task_type: str = "auto",
+    max_rows: int = 5000,
+    time_limit: float = 60,
+    max_workers: int = 4,
+    ) -> str:
+    """
+    Benchmarks lightweight baseline models on a subsample of a DataFrame.
+
+    Args:
+        df (pd.DataFrame): The user's data.
+        target_column (str): The column to predict.
+        task_type (str): "classification", "regression" or "auto" to infer it. Default is "auto".
+        max_rows (int): The maximum number of rows to benchmark on. Default is 5000.
+        time_limit (float): Seconds each model may run. Default is 60.
+        max_workers (int): The number of models benchmarked at the same time. Default is 4.
+
+    Returns:
+        str: A Markdown table of fit time, prediction throughput and cross-validated score.
+    """
+    if target_column not in df.columns:
+        return f"Error: Column '{target_column}' not found. Available columns: {', '.join(map(str, df.columns))}"
+    if task_type == "auto":
+        task_type = infer_task_type(df[target_column])
+    if task_type not in {"classification", "regression"}:
+        return "Error: task_type must be 'classification', 'regression' or 'auto'."
+
+    X, y = prepare_features(df, target_column, task_type, max_rows=max_rows)
+    if len(y) < 10:
+        return "Error: Not enough labelled rows to benchmark models."
+    if X.shape[1] == 0:
+        return "Error: No usable feature columns to benchmark models on."
+    results = run_benchmarks(X, y, task_type, time_limit=time_limit, max_workers=max_workers)
+    return format_results(results, len(y), task_type)
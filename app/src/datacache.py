@@ -0,0 +1,155 @@
+# datacache.py
+"""
+Columnar dataset cache shared across reruns, sessions and batch jobs.
+
+Uploaded CSVs are parsed once, written as uncompressed Arrow IPC files keyed by
+the hash of their content, and loaded memory-mapped afterwards, so repeated
+loads of the same data skip CSV parsing and share the page cache instead of
+holding private copies.
+
+Files are mapped privately (copy-on-write at the page level), so every load
+returns its own writable DataFrame: reading shares the page cache, and writing
+copies only the touched pages, never changing the cached file. Nothing is kept
+in memory between loads.
+"""
+import hashlib
+import io
+import mmap
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+CACHE_DIR = os.getenv(
+    "MLGUIDE_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "mlguide", "datasets"),
+)
+
+
+def content_hash(data: bytes) -> str:
+    """
+    Computes the cache key of a file's content.
+
+    Args:
+        data (bytes): The raw file content.
+
+    Returns:
+        str: A 32-character hexadecimal digest.
+    """
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def cache_path(digest: str, extension: str = "arrow", cache_dir: str = CACHE_DIR) -> str:
+    """
+    Returns the path of a cached artifact for a dataset.
+
+    Args:
+        digest (str): The dataset's content hash.
+        extension (str): The artifact's file extension. Default is "arrow".
+        cache_dir (str): The cache directory. Default is CACHE_DIR.
+
+    Returns:
+        str: The path of the artifact in the cache directory.
+    """
+    return os.path.join(cache_dir, f"{digest}.{extension}")
+
+
+def _normalize_object_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Converts object columns holding a mix of types to strings so Arrow can store them.
+
+    A column can still end up holding e.g. floats and strings, which Arrow rejects.
+    Missing values are kept as missing.
+
+    Args:
+        df (pd.DataFrame): The parsed CSV.
+
+    Returns:
+        pd.DataFrame: The frame with every mixed object column converted to strings.
+    """
+    for column in df.columns[df.dtypes == object]:
+        values = df[column]
+        if pd.api.types.infer_dtype(values, skipna=True) not in ("string", "empty"):
+            df[column] = values.where(values.isna(), values.astype(str))
+    return df
+
+
+def cache_csv(data: bytes, cache_dir: str = CACHE_DIR) -> str:
+    """
+    Converts CSV content to an Arrow IPC file in the cache, unless it is already there.
+
+    Args:
+        data (bytes): The raw CSV content.
+        cache_dir (str): The cache directory. Default is CACHE_DIR.
+
+    Returns:
+        str: The path of the cached Arrow IPC file.
+    """
+    path = cache_path(content_hash(data), cache_dir=cache_dir)
+    if os.path.exists(path):
+        return path
+
+    os.makedirs(cache_dir, exist_ok=True)
+    table = pa.Table.from_pandas(_normalize_object_columns(pd.read_csv(io.BytesIO(data), low_memory=False)), preserve_index=False)
+    # Write to a temporary file first so concurrent sessions never see a partial file.
+    fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as sink, ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    return path
+
+
+def load_dataset(path: str) -> pd.DataFrame:
+    """
+    Loads a cached dataset memory-mapped.
+
+    Integer and float columns without missing values are zero-copy views of a
+    private mapping of the file: their pages are shared with every other load
+    until written to (pandas 2.0 and later; older versions copy them into blocks).
+    Other columns are converted by Arrow.
+
+    Args:
+        path (str): The path of a cached Arrow IPC file.
+
+    Returns:
+        pd.DataFrame: The dataset, safe to modify.
+    """
+    with open(path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+    # Arrow buffers are immutable, so numeric columns are viewed through numpy on the writable mapping instead.
+    memory = np.frombuffer(mapped, dtype=np.uint8)
+    table = ipc.open_file(pa.py_buffer(mapped)).read_all()
+
+    columns = {}
+    for name, column in zip(table.column_names, table.columns):
+        chunk = column.chunks[0] if column.num_chunks == 1 else None
+        if chunk is not None and len(chunk) and chunk.null_count == 0 and (
+            pa.types.is_integer(chunk.type) or pa.types.is_floating(chunk.type)
+        ):
+            width = chunk.type.byte_width
+            start = chunk.buffers()[1].address - memory.ctypes.data + chunk.offset * width
+            columns[name] = memory[start:start + len(chunk) * width].view(chunk.type.to_pandas_dtype())
+        else:
+            columns[name] = column.to_pandas()
+    return pd.DataFrame(columns, copy=False)
+
+
+def read_csv_cached(data: bytes, cache_dir: str = CACHE_DIR) -> pd.DataFrame:
+    """
+    Loads CSV content through the cache, parsing it only the first time it is seen.
+
+    Args:
+        data (bytes): The raw CSV content.
+        cache_dir (str): The cache directory. Default is CACHE_DIR.
+
+    Returns:
+        pd.DataFrame: The dataset, safe to modify.
+    """
+    return load_dataset(cache_csv(data, cache_dir))
@@ -0,0 +1,340 @@
+# router.py
+"""
+Per-agent model routing across the available Groq models.
+
+`ModelRouter` gives each agent its own `ChatGroq` client, chosen from the
+agent's expected context length and task complexity (or from explicit
+routes), with an ordered list of fallback models used on rate limits,
+timeouts and connection errors. Every call's latency, token usage and
+estimated cost is recorded in a `ModelUsageLog` so the routing can be tuned.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import groq
+from langchain_groq import ChatGroq
+
+# Context window, relative quality tier and price in USD per million tokens of each Groq model.
+MODEL_CATALOG: Dict[str, Dict[str, float]] = {
+    "llama3-8b-8192": {"context": 8192, "quality": 1, "input_cost": 0.05, "output_cost": 0.08},
+    "gemma-7b-it": {"context": 8192, "quality": 1, "input_cost": 0.07, "output_cost": 0.07},
+    "mixtral-8x7b-32768": {"context": 32768, "quality": 2, "input_cost": 0.24, "output_cost": 0.24},
+    "llama3-70b-8192": {"context": 8192, "quality": 3, "input_cost": 0.59, "output_cost": 0.79},
+}
+
+# Tokens of context each agent needs and the quality tier its tasks call for.
+AGENT_PROFILES: Dict[str, Dict[str, int]] = {
+    "Problem_Definition_Agent": {"context": 2048, "complexity": 1},
+    "Data_Assessment_Agent": {"context": 6144, "complexity": 2},
+    "Model_Recommendation_Agent": {"context": 16384, "complexity": 2},
+    "Researcher": {"context": 16384, "complexity": 2},
+    "Machine_Learning_Engineer": {"context": 8000, "complexity": 3},
+    "Summarization_Agent": {"context": 6144, "complexity": 1},
+}
+
+# Model used for agents without a profile or route when none is configured.
+DEFAULT_MODEL = "llama3-70b-8192"
+
+# Errors after which the same request is retried on the next fallback model.
+FALLBACK_ERRORS = (
+    groq.RateLimitError,
+    groq.APITimeoutError,
+    groq.APIConnectionError,
+    groq.InternalServerError,
+)
+
+
+def is_context_length_error(error: Exception) -> bool:
+    """
+    Tells whether a request failed because its prompt does not fit the model's context window.
+
+    Args:
+        error (Exception): The error raised by the Groq client.
+
+    Returns:
+        bool: True for a `groq.BadRequestError` reporting an exceeded context length.
+    """
+    if not isinstance(error, groq.BadRequestError):
+        return False
+    details = f"{getattr(error, 'code', '') or ''} {getattr(error, 'body', '') or ''} {error}".lower()
+    return "context_length" in details or "context length" in details or "reduce the length" in details
+
+
+class ModelUsageLog:
+    """
+    Thread-safe record of the latency, token usage and cost of every routed LLM call.
+
+    Args:
+        path (str, optional): A JSON Lines file every record is also appended to.
+    """
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path = path
+        self.records: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        agent: str,
+        model: str,
+        seconds: float,
+        status: str,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0,
+        ) -> None:
+        """
+        Records one LLM call.
+
+        Args:
+            agent (str): The role of the agent that made the call.
+            model (str): The model that served (or failed) the call.
+            seconds (float): The wall time of the call.
+            status (str): "ok" or the name of the error that triggered a fallback.
+            prompt_tokens (int): The number of prompt tokens used.
+            completion_tokens (int): The number of completion tokens generated.
+        """
+        prices = MODEL_CATALOG.get(model, {})
+        cost = (
+            prompt_tokens * prices.get("input_cost", 0.0)
+            + completion_tokens * prices.get("output_cost", 0.0)
+        ) / 1_000_000
+        record = {
+            "time": time.time(),
+            "agent": agent,
+            "model": model,
+            "status": status,
+            "seconds": round(seconds, 3),
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "cost": cost,
+        }
+        with self._lock:
+            self.records.append(record)
+            if self.path:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record) + "\n")
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        Aggregates the recorded calls per model.
+
+        Returns:
+            Dict[str, Dict[str, float]]: Calls, errors, mean latency, tokens and total cost per model.
+        """
+        with self._lock:
+            records = list(self.records)
+
+        summary: Dict[str, Dict[str, float]] = {}
+        for record in records:
+            stats = summary.setdefault(record["model"], {
+                "calls": 0, "errors": 0, "seconds": 0.0, "prompt_tokens": 0, "completion_tokens": 0, "cost": 0.0,
+            })
+            stats["calls"] += 1
+            stats["errors"] += record["status"] != "ok"
+            stats["seconds"] += record["seconds"]
+            stats["prompt_tokens"] += record["prompt_tokens"]
+            stats["completion_tokens"] += record["completion_tokens"]
+            stats["cost"] += record["cost"]
+        for stats in summary.values():
+            stats["mean_seconds"] = round(stats["seconds"] / stats["calls"], 3)
+        return summary
+
+
+class RoutedChatGroq(ChatGroq):
+    """
+    A `ChatGroq` client that falls back to other models on transient errors and records its usage.
+
+    When a prompt exceeds the model's context window, only models with a larger window are tried.
+    """
+
+    agent_role: str = ""
+    fallback_models: List[str] = []
+    usage_log: Any = None
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        models = [self.model_name] + [m for m in self.fallback_models if m != self.model_name]
+        attempt = 0
+        while True:
+            model = models[attempt]
+            llm = self if attempt == 0 else self.copy(update={"model_name": model, "fallback_models": []})
+            start = time.perf_counter()
+            try:
+                result = super(RoutedChatGroq, llm)._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+            except Exception as e:
+                context_exceeded = is_context_length_error(e)
+                if not context_exceeded and not isinstance(e, FALLBACK_ERRORS):
+                    raise
+                status = "context_length_exceeded" if context_exceeded else type(e).__name__
+                self._record(model, time.perf_counter() - start, status)
+                if context_exceeded:
+                    # Only a model with a larger window can take the same prompt.
+                    context = MODEL_CATALOG.get(model, {}).get("context", 0)
+                    models = models[:attempt + 1] + [
+                        m for m in models[attempt + 1:] if MODEL_CATALOG.get(m, {}).get("context", 0) > context
+                    ]
+                if attempt == len(models) - 1:
+                    raise
+                logging.warning(f"{self.agent_role}: {model} failed with {status}, falling back to {models[attempt + 1]}")
+                attempt += 1
+                continue
+
+            usage = (result.llm_output or {}).get("token_usage") or {}
+            self._record(
+                model,
+                time.perf_counter() - start,
+                "ok",
+                usage.get("prompt_tokens", 0),
+                usage.get("completion_tokens", 0),
+            )
+            return result
+
+    def _record(self, model: str, seconds: float, status: str, prompt_tokens: int = 0, completion_tokens: int = 0) -> None:
+        if self.usage_log is not None:
+            self.usage_log.record(self.agent_role, model, seconds, status, prompt_tokens, completion_tokens)
+
+
+class ModelRouter:
+    """
+    Chooses a Groq model and fallbacks for each agent.
+
+    Modes:
+        "auto": the cheapest model whose context window and quality tier fit the
+            agent's profile in AGENT_PROFILES.
+        "fixed": `default_model` for every agent.
+    Explicit `routes` (agent role -> model name) take precedence in both modes.
+
+    Args:
+        groq_api_key (str): The Groq API key.
+        default_model (str): The model used for agents without a profile or route.
+        mode (str): "auto" or "fixed". Default is "auto".
+        routes (Dict[str, str], optional): Explicit agent role to model assignments.
+        available_models (List[str], optional): The models routing may choose from.
+            Defaults to every model in MODEL_CATALOG.
+        request_timeout (float): Seconds before a request times out and falls back. Default is 60.
+        usage_log (ModelUsageLog, optional): Where calls are recorded. A new log is created by default.
+
+    Raises:
+        ValueError: If the mode or a routed agent role is unknown, or the default model or a routed model
+            is not in MODEL_CATALOG.
+    """
+
+    def __init__(
+        self,
+        groq_api_key: str,
+        default_model: str = DEFAULT_MODEL,
+        mode: str = "auto",
+        routes: Optional[Dict[str, str]] = None,
+        available_models: Optional[List[str]] = None,
+        request_timeout: float = 60,
+        usage_log: Optional[ModelUsageLog] = None,
+        ) -> None:
+        if mode not in {"auto", "fixed"}:
+            raise ValueError(f"Unknown routing mode '{mode}', expected 'auto' or 'fixed'.")
+        known = ", ".join(MODEL_CATALOG)
+        if default_model not in MODEL_CATALOG:
+            raise ValueError(f"Unknown default model {default_model!r} for routing, expected one of: {known}.")
+        for agent_role, model in (routes or {}).items():
+            if agent_role not in AGENT_PROFILES:
+                raise ValueError(f"Unknown agent role {agent_role!r} in routes, expected one of: {', '.join(AGENT_PROFILES)}.")
+            if model not in MODEL_CATALOG:
+                raise ValueError(f"Unknown model {model!r} routed to {agent_role}, expected one of: {known}.")
+        self.groq_api_key = groq_api_key
+        self.default_model = default_model
+        self.mode = mode
+        self.routes = routes or {}
+        self.available_models = [m for m in (available_models or list(MODEL_CATALOG)) if m in MODEL_CATALOG]
+        self.request_timeout = request_timeout
+        self.usage_log = usage_log or ModelUsageLog()
+
+    @classmethod
+    def from_env(cls, groq_api_key: str, default_model: Optional[str], **kwargs: Any) -> Optional["ModelRouter"]:
+        """
+        Builds a router from the `MODEL_ROUTING`, `MODEL_ROUTES` and `MODEL_USAGE_LOG` environment variables.
+
+        `MODEL_ROUTING` is "auto", "fixed" or unset/"off" to disable routing, and
+        `MODEL_ROUTES` an optional JSON object of agent role to model name.
+
+        Args:
+            groq_api_key (str): The Groq API key.
+            default_model (str, optional): The model used for agents without a profile or route,
+                typically the `MODEL` environment variable. Defaults to DEFAULT_MODEL when unset.
+            **kwargs: Further ModelRouter arguments.
+
+        Returns:
+            Optional[ModelRouter]: The router, or None if routing is disabled.
+
+        Raises:
+            ValueError: If MODEL_ROUTES is malformed or names an unknown model.
+        """
+        mode = os.getenv("MODEL_ROUTING", "off").lower()
+        if mode in {"", "off"}:
+            return None
+        try:
+            routes = json.loads(os.getenv("MODEL_ROUTES") or "{}")
+        except json.JSONDecodeError as e:
+            raise ValueError(f"MODEL_ROUTES is not valid JSON: {e}") from e
+        if not isinstance(routes, dict):
+            raise ValueError("MODEL_ROUTES must be a JSON object mapping agent roles to model names.")
+        if not default_model:
+            logging.info(f"MODEL is not set; routing falls back to {DEFAULT_MODEL} where no model is chosen.")
+            default_model = DEFAULT_MODEL
+        usage_log = ModelUsageLog(os.getenv("MODEL_USAGE_LOG"))
+        return cls(groq_api_key, default_model, mode=mode, routes=routes, usage_log=usage_log, **kwargs)
+
+    def route(self, agent_role: str) -> List[str]:
+        """
+        Chooses the model and fallbacks for an agent.
+
+        Args:
+            agent_role (str): The role of the agent.
+
+        Returns:
+            List[str]: The primary model followed by its fallbacks, in order of preference.
+        """
+        profile = AGENT_PROFILES.get(agent_role, {"context": 0, "complexity": 0})
+
+        def cost(model: str) -> float:
+            return MODEL_CATALOG[model]["input_cost"] + MODEL_CATALOG[model]["output_cost"]
+
+        fits = [m for m in self.available_models if MODEL_CATALOG[m]["context"] >= profile["context"]]
+        capable = sorted((m for m in fits if MODEL_CATALOG[m]["quality"] >= profile["complexity"]), key=cost)
+        weaker = sorted((m for m in fits if m not in capable), key=lambda m: -MODEL_CATALOG[m]["quality"])
+        too_small = sorted(
+            (m for m in self.available_models if m not in fits),
+            key=lambda m: -MODEL_CATALOG[m]["context"],
+        )
+        ranked = capable + weaker + too_small
+
+        if agent_role in self.routes:
+            primary = self.routes[agent_role]
+        elif self.mode == "auto" and agent_role in AGENT_PROFILES and ranked:
+            primary = ranked[0]
+        else:
+            primary = self.default_model
+        return [primary] + [m for m in ranked if m != primary]
+
+    def for_agent(self, agent_role: str) -> RoutedChatGroq:
+        """
+        Creates the LLM client for an agent.
+
+        Args:
+            agent_role (str): The role of the agent.
+
+        Returns:
+            RoutedChatGroq: A client for the agent's routed model with its fallbacks.
+        """
+        models = self.route(agent_role)
+        return RoutedChatGroq(
+            temperature=0,
+            groq_api_key=self.groq_api_key,
+            model_name=models[0],
+            request_timeout=self.request_timeout,
+            max_retries=1,
+            agent_role=agent_role,
+            fallback_models=models[1:],
+            usage_log=self.usage_log,
+        )
@@ -0,0 +1,325 @@
+# sandbox.py
+"""
+Sandboxed execution and profiling of generated Python code.
+
+Each program runs in its own isolated-mode Python subprocess (`python -I`),
+inside a temporary working directory holding a sample of the user's data, with
+CPU-time, memory and wall clock limits and a minimal environment that carries
+none of the parent's variables or API keys. The child reports any exception,
+its wall time, peak resident memory and a cProfile summary of its hottest
+functions. Several programs run at the same time.
+
+This is not a security boundary: programs can still read and write any file the
+server process can and open network connections. Since the programs are written
+by an LLM that also reads web pages, the execution tool is only given to the
+agents when `MLGUIDE_CODE_EXECUTION` is set (see `code_execution_enabled`).
+Resource limits rely on the POSIX `resource` module, so execution is refused on
+platforms without it (Windows).
+
+This file is also the child's entry point: `python sandbox.py <code> <result> <cpu> <memory>`.
+"""
+import importlib.util
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Tuple
+
+# Environment variables passed through to the sandbox; everything else is dropped.
+PASSED_ENV_VARS = ("PATH", "LANG", "LC_ALL", "LC_CTYPE")
+HOT_FUNCTIONS = 10
+# Profile entries from the import machinery, which would otherwise dominate short programs.
+IMPORT_FRAME_MARKERS = ("<frozen ", "importlib", "<built-in method _imp.", "<built-in method marshal.")
+RESOURCE_LIMITS_AVAILABLE = importlib.util.find_spec("resource") is not None
+
+
+def code_execution_enabled() -> bool:
+    """
+    Tells whether running generated code was opted into with the `MLGUIDE_CODE_EXECUTION` environment variable.
+
+    Returns:
+        bool: True if the variable is "1", "true", "yes" or "on".
+    """
+    return os.getenv("MLGUIDE_CODE_EXECUTION", "").strip().lower() in {"1", "true", "yes", "on"}
+
+
+def extract_code(text: str) -> str:
+    """
+    Extracts the Python program from an LLM answer.
+
+    Args:
+        text (str): Code, or Markdown containing fenced code blocks.
+
+    Returns:
+        str: The fenced Python blocks joined in order, or the text itself if it has no fences.
+    """
+    blocks = re.findall(r"```(?:python|py)?[ \t]*\n(.*?)```", text, re.DOTALL)
+    return "\n\n".join(blocks) if blocks else text
+
+
+def _sandbox_env(workdir: str) -> Dict[str, str]:
+    env = {name: os.environ[name] for name in PASSED_ENV_VARS if name in os.environ}
+    env.update(
+        HOME=workdir,
+        TMPDIR=workdir,
+        MPLBACKEND="Agg",
+        OMP_NUM_THREADS="1",
+        OPENBLAS_NUM_THREADS="1",
+        MKL_NUM_THREADS="1",
+    )
+    return env
+
+
+def run_sandboxed(
+    code: str,
+    data: Any = None,
+    file_names: Tuple[str, ...] = ("data.csv",),
+    time_limit: float = 60,
+    memory_limit_mb: int = 2048,
+    ) -> Dict[str, Any]:
+    """
+    Runs a program in an isolated subprocess and profiles it.
+
+    Args:
+        code (str): The Python program to run.
+        data (pd.DataFrame, optional): Data written as CSV into the working directory under every name in `file_names`.
+        file_names (Tuple[str, ...]): The file names the program may read the data from. Default is ("data.csv",).
+        time_limit (float): Wall clock seconds before the program is killed; also its CPU-time limit. Default is 60.
+        memory_limit_mb (int): The address space limit of the program in MB. Default is 2048.
+
+    Returns:
+        Dict[str, Any]: "status" ("ok", "error", "timeout", "crashed" or "unsupported"), "error",
+            "wall_seconds", "import_seconds", "peak_memory_mb", "hot_functions", "snippet_functions", "stdout" and "rows".
+    """
+    if not RESOURCE_LIMITS_AVAILABLE:
+        return {
+            "rows": 0 if data is None else len(data),
+            "status": "unsupported",
+            "error": "Sandboxed execution needs POSIX resource limits, which this platform does not provide.",
+        }
+
+    with tempfile.TemporaryDirectory(prefix="mlguide-sandbox-") as workdir:
+        if data is not None:
+            for file_name in file_names:
+                data.to_csv(os.path.join(workdir, os.path.basename(file_name)), index=False)
+        code_path = os.path.join(workdir, "snippet.py")
+        result_path = os.path.join(workdir, "result.json")
+        with open(code_path, "w", encoding="utf-8") as f:
+            f.write(code)
+
+        command = [
+            sys.executable, "-I", os.path.abspath(__file__),
+            code_path, result_path, str(int(time_limit) + 1), str(memory_limit_mb),
+        ]
+        result: Dict[str, Any] = {"rows": 0 if data is None else len(data)}
+        try:
+            completed = subprocess.run(
+                command, cwd=workdir, env=_sandbox_env(workdir), capture_output=True, text=True, timeout=time_limit,
+            )
+        except subprocess.TimeoutExpired as e:
+            stdout = e.stdout.decode(errors="replace") if isinstance(e.stdout, bytes) else e.stdout or ""
+            result.update(status="timeout", error=f"Timed out after {time_limit:g}s", stdout=stdout[-2000:])
+            return result
+
+        if os.path.exists(result_path):
+            with open(result_path, "r", encoding="utf-8") as f:
+                result.update(json.load(f))
+        else:
+            # Killed by a resource limit or crashed before it could report.
+            result.update(status="crashed", error=completed.stderr[-2000:] or f"Exit code {completed.returncode}")
+        result["stdout"] = completed.stdout[-2000:]
+        return result
+
+
+def run_snippets(
+    runs: List[Tuple[str, int]],
+    df: Any = None,
+    file_names: Tuple[str, ...] = ("data.csv",),
+    time_limit: float = 60,
+    memory_limit_mb: int = 2048,
+    max_workers: int = 4,
+    ) -> List[Dict[str, Any]]:
+    """
+    Runs several programs in parallel sandboxes, each on its own sample of the data.
+
+    Args:
+        runs (List[Tuple[str, int]]): (program, number of sample rows) pairs.
+        df (pd.DataFrame, optional): The user's data, sampled for each run.
+        file_names (Tuple[str, ...]): The file names the programs may read the data from.
+        time_limit (float): Wall clock seconds each program may run. Default is 60.
+        memory_limit_mb (int): The address space limit of each program in MB. Default is 2048.
+        max_workers (int): The number of programs run at the same time. Default is 4.
+
+    Returns:
+        List[Dict[str, Any]]: One result per run, in order (see `run_sandboxed`).
+    """
+    def run(job: Tuple[str, int]) -> Dict[str, Any]:
+        code, sample_rows = job
+        data = None
+        if df is not None:
+            data = df if len(df) <= sample_rows else df.sample(n=sample_rows, random_state=0)
+        return run_sandboxed(code, data, file_names, time_limit, memory_limit_mb)
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        return list(executor.map(run, runs))
+
+
+def format_report(results: List[Dict[str, Any]]) -> str:
+    """
+    Formats sandbox results as Markdown.
+
+    Args:
+        results (List[Dict[str, Any]]): The results from `run_snippets`.
+
+    Returns:
+        str: One section per run with its status, timings, memory, hot functions and error.
+    """
+    sections = []
+    for result in results:
+        lines = [f"### Run on {result['rows']} rows: {result['status']}"]
+        if "wall_seconds" in result:
+            lines.append(f"- Wall time: {result['wall_seconds']:.3f}s")
+        if "import_seconds" in result:
+            lines.append(f"- Of which importing modules: {result['import_seconds']:.3f}s (leading imports, not profiled)")
+        if "peak_memory_mb" in result:
+            lines.append(f"- Peak memory: {result['peak_memory_mb']:.1f} MB")
+        for title, field in (("Program functions", "snippet_functions"), ("Hottest functions overall", "hot_functions")):
+            if result.get(field):
+                lines += ["", f"{title}:", "", "| Function | Calls | Own time (s) | Cumulative (s) |", "|---|---|---|---|"]
+                lines += [
+                    f"| {f['function']} | {f['calls']} | {f['own_seconds']:.4f} | {f['cumulative_seconds']:.4f} |"
+                    for f in result[field]
+                ]
+        if result.get("error"):
+            lines += ["", "```", result["error"].strip(), "```"]
+        sections.append("\n".join(lines))
+    return "\n\n".join(sections)
+
+
+def _peak_memory_mb() -> float:
+    """
+    Returns the peak resident memory of the current process in MB.
+
+    On Linux, `ru_maxrss` survives fork and exec, so it would report at least the
+    server's memory; the VmHWM high-water mark in /proc is reset by exec instead.
+    """
+    import resource
+
+    try:
+        with open("/proc/self/status", "r", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # ru_maxrss is reported in KB on Linux and in bytes on macOS.
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def _child_main(code_path: str, result_path: str, cpu_seconds: int, memory_limit_mb: int) -> None:
+    """
+    Runs inside the sandbox: applies resource limits, executes the program under cProfile and writes the result.
+
+    The program's leading imports are excluded from the profile, and its own functions are
+    reported separately from the hottest functions overall.
+    """
+    import ast
+    import cProfile
+    import resource
+    import time
+    import traceback
+
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 1))
+    memory_bytes = memory_limit_mb * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (memory_bytes, memory_bytes))
+
+    # Behave like `python snippet.py` run from the working directory.
+    sys.argv = ["snippet.py"]
+    sys.path.insert(0, os.getcwd())
+    with open(code_path, "r", encoding="utf-8") as f:
+        source = f.read()
+
+    result: Dict[str, Any] = {"status": "ok", "error": "", "import_seconds": 0.0}
+    profiler = cProfile.Profile()
+    namespace = {"__name__": "__main__"}
+
+    def run(code: Any, profile: bool) -> bool:
+        try:
+            if profile:
+                profiler.runctx(code, namespace, namespace)
+            else:
+                exec(code, namespace)
+        except SystemExit as e:
+            if e.code in (None, 0):
+                return False
+            result.update(status="error", error=f"SystemExit: {e.code}")
+            return False
+        except Exception as e:
+            # Start the traceback at the program, hiding the sandbox's own frames.
+            tb = e.__traceback__
+            while tb is not None and tb.tb_frame.f_code.co_filename != "snippet.py":
+                tb = tb.tb_next
+            error = "".join(traceback.format_exception(type(e), e, tb))
+            result.update(status="error", error=error)
+            return False
+        return True
+
+    start = time.perf_counter()
+    try:
+        body = ast.parse(source, "snippet.py").body
+    except SyntaxError:
+        body = None
+        result.update(status="error", error=traceback.format_exc(limit=0))
+    if body is not None:
+        # The leading imports run unprofiled and are timed separately, so module loading
+        # does not drown out the program's own work.
+        split = 0
+        while split < len(body) and isinstance(body[split], (ast.Import, ast.ImportFrom)):
+            split += 1
+        setup = compile(ast.Module(body=body[:split], type_ignores=[]), "snippet.py", "exec")
+        program = compile(ast.Module(body=body[split:], type_ignores=[]), "snippet.py", "exec")
+        if run(setup, profile=False):
+            result["import_seconds"] = time.perf_counter() - start
+            run(program, profile=True)
+    result["wall_seconds"] = time.perf_counter() - start
+    result["peak_memory_mb"] = _peak_memory_mb()
+
+    def summarize(entries: List[Any]) -> List[Dict[str, Any]]:
+        hottest = sorted(entries, key=lambda item: item[1][3], reverse=True)[:HOT_FUNCTIONS]
+        return [
+            {
+                "function": f"{os.path.basename(file)}:{line}({name})",
+                "calls": calls,
+                "own_seconds": own_time,
+                "cumulative_seconds": cumulative_time,
+            }
+            for (file, line, name), (_, calls, own_time, cumulative_time, _) in hottest
+        ]
+
+    def is_noise(file: str, name: str) -> bool:
+        # Import machinery, module bodies of imported libraries, exec/compile and the profiler itself.
+        if file == "snippet.py":
+            return False
+        return (
+            any(marker in file or marker in name for marker in IMPORT_FRAME_MARKERS)
+            or name == "<module>"
+            or name in ("<built-in method builtins.exec>", "<built-in method builtins.compile>")
+            or "_lsprof.Profiler" in name
+        )
+
+    profiler.create_stats()
+    entries = list(profiler.stats.items())
+    result["snippet_functions"] = summarize([entry for entry in entries if entry[0][0] == "snippet.py"])
+    result["hot_functions"] = summarize([
+        entry for entry in entries if entry[0][0] != "snippet.py" and not is_noise(entry[0][0], entry[0][2])
+    ])
+    with open(result_path, "w", encoding="utf-8") as f:
+        json.dump(result, f)
+
+
+if __name__ == "__main__":
+    _child_main(sys.argv[1], sys.argv[2], int(sys.argv[3]), int(sys.argv[4]))
@@ -1,10 +1,20 @@
 import streamlit as st
 import re
-import PIL
 import logging
 import os
 import json
 from typing import Union, List, Tuple, Dict, Any, Callable
+from tools import plot_images
+
+# Characters of a tool result shown at first and added by each "Load more".
+RESULT_PAGE_CHARS = 4000
+# Larger JSON-looking results are shown as text instead of being parsed.
+MAX_JSON_CHARS = 200_000
+
+# Fragments (st.experimental_fragment from Streamlit 1.33, st.fragment from 1.37) rerun on
+# their own, so paging a result does not rerun the whole app and lose the crew's output.
+_fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None)
+_FENCE_RE = re.compile(r"^\s{0,3}(`{3,}|~{3,})")
 
 
 def create_sidebar(title: str = "Select LLM|Input Groq API Key") -> Tuple[str, str, str]:
@@ -57,26 +67,167 @@ def is_valid_json(json_string: str) -> bool:
     return True
 
 
-def extract_info_from_action(input_str: str) -> Tuple[Union[str, None], Union[str, None], Union[str, None]]:
+def extract_info_from_action(action: Any) -> Tuple[Union[str, None], Union[str, None], Union[str, None]]:
     """
-    Extracts the thought, tool input, tool output, and tool from a Streamlit callback input string.
+    Extracts the tool, tool input, and thought from an agent action.
 
     Args:
-        input_str (str): The input string from the Streamlit callback.
+        action (Any): The AgentAction from the Streamlit callback, or its string representation.
 
     Returns:
         Tuple[Union[str, None], Union[str, None], Union[str, None]]: Extracted tool, tool input, and thought.
     """
-    tool_match = re.search(r"tool='(.*?)'", input_str)
-    tool = tool_match.group(1) if tool_match else None
+    if isinstance(action, str):
+        tool_match = re.search(r"tool='(.*?)'", action)
+        tool_input_match = re.search(r"tool_input='(.*?)(?:'[\s,])", action, re.DOTALL)
+        thought_match = re.search(r"Thought:\s*(.*?)(?:\n|$)", action)
+        return (
+            tool_match.group(1) if tool_match else None,
+            tool_input_match.group(1).strip() if tool_input_match else None,
+            thought_match.group(1).strip() if thought_match else None,
+        )
+
+    tool = getattr(action, "tool", None) or None
+
+    tool_input = getattr(action, "tool_input", None)
+    if tool_input is not None and not isinstance(tool_input, str):
+        tool_input = json.dumps(tool_input, default=str)
+    tool_input = tool_input.strip() if tool_input else None
+
+    _, found, thought = (getattr(action, "log", None) or "").partition("Thought:")
+    thought = thought.strip().split("\n", 1)[0].strip() if found else None
+
+    return tool, tool_input, thought or None
 
-    tool_input_match = re.search(r"tool_input='(.*?)(?:'[\s,])", input_str, re.DOTALL)
-    tool_input = tool_input_match.group(1).strip() if tool_input_match else None
 
-    thought_match = re.search(r"Thought:\s*(.*?)(?:\n|$)", input_str)
-    thought = thought_match.group(1).strip() if thought_match else None
+def sniff_content_type(observation: Any) -> str:
+    """
+    Cheaply determines how a tool result should be rendered.
+
+    Only results that look like JSON and are small enough are parsed.
+
+    Args:
+        observation (Any): The tool result.
+
+    Returns:
+        str: "image", "json" or "text".
+    """
+    if isinstance(observation, (dict, list)):
+        return "json"
+    if not isinstance(observation, str):
+        return "text"
+    if observation in plot_images or (
+        len(observation) < 1024 and "\n" not in observation and is_image_path(observation)
+    ):
+        return "image"
+    stripped = observation.strip()
+    if stripped[:1] in "{[" and stripped[-1:] in "}]" and len(stripped) <= MAX_JSON_CHARS and is_valid_json(stripped):
+        return "json"
+    return "text"
+
+
+def _load_more(key: str) -> None:
+    st.session_state[key] = st.session_state.get(key, 1) + 1
+
+
+def truncate_markdown(text: str, max_chars: int) -> str:
+    """
+    Shortens Markdown to at most about `max_chars` characters without breaking the rest of the page.
+
+    The text is cut at a line boundary where possible, and a code fence left open by the cut is closed.
+
+    Args:
+        text (str): The Markdown text.
+        max_chars (int): The number of characters to keep.
 
-    return tool, tool_input, thought
+    Returns:
+        str: The shortened text, or `text` itself if it already fits.
+    """
+    if len(text) <= max_chars:
+        return text
+    # A line boundary in the first half is ignored, so each "Load more" still shows more of a very long line.
+    cut = text.rfind("\n", max_chars // 2, max_chars)
+    shown = text[:cut] if cut > 0 else text[:max_chars]
+
+    fence = None
+    for line in shown.splitlines():
+        marker = _FENCE_RE.match(line)
+        if not marker:
+            continue
+        if fence is None:
+            fence = marker.group(1)
+        elif marker.group(1)[0] == fence[0] and len(marker.group(1)) >= len(fence):
+            fence = None
+    return f"{shown}\n{fence}" if fence else shown
+
+
+def _render_page(observation: Any, content_type: str, key: str) -> None:
+    """
+    Renders a tool result, showing long text one page at a time.
+
+    Without fragments a "Load more" click would rerun the whole app, so the first
+    page is followed by a button to download the full text instead.
+    """
+    if content_type == "image":
+        image = plot_images.get(observation)
+        if image is not None:
+            st.image(image)
+        elif os.path.isfile(observation):
+            st.image(observation)
+        else:
+            st.write(observation)
+        return
+    if content_type == "json":
+        st.json(observation)
+        return
+
+    text = str(observation)
+    shown = truncate_markdown(text, st.session_state.get(key, 1) * RESULT_PAGE_CHARS)
+    st.write(shown)
+    if len(shown) < len(text):
+        st.caption(f"Showing about {len(shown):,} of {len(text):,} characters.")
+        if _fragment is not None:
+            st.button("Load more", key=f"{key}-more", on_click=_load_more, args=(key,))
+        else:
+            st.download_button("Download full result", text, file_name="tool_result.txt", key=f"{key}-download")
+
+
+def _render_lazily(observation: Any, content_type: str, key: str) -> None:
+    # Nothing is rendered or sent to the browser until the toggle is switched on.
+    if st.toggle("See Tool Result", key=f"{key}-open"):
+        _render_page(observation, content_type, key)
+
+
+if _fragment is not None:
+    _render_lazily = _fragment(_render_lazily)
+
+
+def _next_result_key() -> str:
+    # Counted per session, so concurrent sessions do not share or grow each other's keys.
+    count = st.session_state.get("_tool_result_count", 0)
+    st.session_state["_tool_result_count"] = count + 1
+    return f"tool-result-{count}"
+
+
+def render_tool_result(observation: Any) -> None:
+    """
+    Renders a tool result collapsed, sending it to the browser only once it is opened.
+
+    The result sits behind a toggle in a fragment, so opening it and paging through
+    long text with "Load more" rerun only that result. Without Streamlit fragments,
+    where that would rerun the whole app, the result's first page is shown in an
+    expander with a button to download the full text.
+
+    Args:
+        observation (Any): The tool result.
+    """
+    content_type = sniff_content_type(observation)
+    key = _next_result_key()
+    if _fragment is not None:
+        _render_lazily(observation, content_type, key)
+    else:
+        with st.expander("See Tool Result:"):
+            _render_page(observation, content_type, key)
 
 
 agent_finishes = []
@@ -97,7 +248,7 @@ def create_streamlit_callback(agent_role: str, agent_avatar: str) -> Callable:
             for step in step_output:
                 if isinstance(step, tuple) and len(step) == 2:
                     action, observation = step
-                    tool, tool_input, thought = extract_info_from_action(str(action))
+                    tool, tool_input, thought = extract_info_from_action(action)
 
                     display_messages = []
 
@@ -117,14 +268,7 @@ def create_streamlit_callback(agent_role: str, agent_avatar: str) -> Callable:
                         with st.chat_message(agent_role, avatar=agent_avatar):
                             for message in display_messages:
                                 st.markdown(message)
-                            with st.expander("See Tool Result:"):
-                                if is_image_path(observation):
-                                    st.image(PIL.Image.open(observation))
-                                else:
-                                    if is_valid_json(observation):
-                                        st.json(observation)
-                                    else:
-                                        st.write(observation)
+                            render_tool_result(observation)
                 else:
                     with st.chat_message(agent_role, avatar=agent_avatar):
                         st.markdown(step)
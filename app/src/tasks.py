@@ -36,7 +36,7 @@ def setup_tasks(
     )
 
     task_recommend_model = Task(
-        description="Suggest suitable machine learning models for the defined problem and assessed data, providing rationale for each suggestion.",
+        description="Suggest suitable machine learning models for the defined problem and assessed data, providing rationale for each suggestion. If a tool for benchmarking baseline models is available, use it on the target column and ground the recommendations in the measured scores, fit times and prediction throughput.",
         agent=agents["Model_Recommendation"],
         expected_output="A list of suitable machine learning models for the defined problem and assessed data, along with the rationale for each suggestion.",
         context=[task_define_problem, task_assess_data]
@@ -57,7 +57,7 @@ def setup_tasks(
     )
 
     task_reflect_on_code = Task(
-        description="Review and reflect on the generated Python code to ensure it meets the project requirements and is optimized for performance.",
+        description="Review and reflect on the generated Python code to ensure it meets the project requirements and is optimized for performance. If a tool for executing and profiling Python code is available, run the generated code with it first and base the review on the measured exceptions, wall times, peak memory and hottest functions.",
         agent=agents["Machine_Learning_Engineer"],
         expected_output="Reflections and suggestions for improving the initial code.",
         context=[task_generate_code, task_define_problem, task_research_docs, task_assess_data]
@@ -3,18 +3,167 @@ import os
 import matplotlib.pyplot as plt
 import numpy as np
 import requests
+import io
 import logging
+import re
 from textwrap import dedent
-from bs4 import BeautifulSoup
 import arxiv
 import fitz  # PyMuPDF
 import pandas as pd
 import sweetviz as sv
 import streamlit as st
-from typing import List, Union
+from benchmark import benchmark_dataframe
+from sandbox import extract_code, format_report, run_snippets
+import threading
+import time
+import hashlib
+from contextvars import ContextVar
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple, Union
 
 api_key = os.getenv('JINA_API_KEY')
 
+# Directory the plotting tools write into. Batch runs set a per-job directory so
+# concurrent crews never overwrite each other's plots.
+_plots_dir: ContextVar[str] = ContextVar("plots_dir", default="./plots")
+# pyplot keeps global state, so figures from concurrent crews must not interleave.
+_plot_lock = threading.Lock()
+
+# PNG bytes of the most recent plots by path, so the UI can show them without reading the files back.
+plot_images: Dict[str, bytes] = {}
+MAX_PLOT_IMAGES = 64
+
+# Successful Jina responses and extracted arXiv PDF text shared by every crew in the process, keyed by
+# URL and the credentials they were fetched with. Disabled unless `enable_response_cache` is called (batch mode).
+_response_cache: "OrderedDict[Tuple[str, str], Tuple[float, bytes]]" = OrderedDict()
+_response_cache_lock = threading.Lock()
+_response_cache_settings = {"enabled": False, "max_entries": 0, "max_bytes": 0, "ttl": 0.0, "bytes": 0}
+
+
+def set_plots_dir(path: str):
+    """
+    Sets the directory the plotting tools save images into for the current context.
+
+    Args:
+        path (str): The directory to save plots into.
+
+    Returns:
+        contextvars.Token: Token restoring the previous directory when reset.
+    """
+    return _plots_dir.set(path)
+
+
+def get_plots_dir() -> str:
+    """
+    Returns the plot directory of the current context, creating it if needed.
+
+    Returns:
+        str: The directory the plotting tools save images into.
+    """
+    plots_dir = _plots_dir.get()
+    os.makedirs(plots_dir, exist_ok=True)
+    return plots_dir
+
+
+def _save_figure(path: str) -> None:
+    """
+    Saves the current Matplotlib figure to `path` and keeps its bytes in `plot_images`.
+
+    Args:
+        path (str): The path to save the image to.
+    """
+    buffer = io.BytesIO()
+    plt.savefig(buffer, format=os.path.splitext(path)[1].lstrip(".") or "png")
+    with open(path, "wb") as f:
+        f.write(buffer.getvalue())
+    plot_images.pop(path, None)
+    plot_images[path] = buffer.getvalue()
+    while len(plot_images) > MAX_PLOT_IMAGES:
+        plot_images.pop(next(iter(plot_images)))
+
+
+def enable_response_cache(max_entries: int = 256, max_bytes: int = 64 * 1024 * 1024, ttl: float = 3600) -> None:
+    """
+    Enables the process-wide cache of successful Jina responses and extracted arXiv text.
+
+    Meant for batch runs, where many crews research similar problems with the same
+    credentials. The cache is an LRU bounded by entry count and total size, and
+    entries expire after `ttl` seconds.
+
+    Args:
+        max_entries (int): The maximum number of cached responses. Default is 256.
+        max_bytes (int): The maximum total size of the cached responses. Default is 64 MB.
+        ttl (float): Seconds a cached response stays valid. Default is 3600.
+    """
+    with _response_cache_lock:
+        _response_cache_settings.update(enabled=True, max_entries=max_entries, max_bytes=max_bytes, ttl=ttl)
+
+
+def _cache_lookup(key: Tuple[str, str]) -> Optional[bytes]:
+    """
+    Returns a cached, unexpired value and marks it as recently used.
+    """
+    with _response_cache_lock:
+        entry = _response_cache.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[0] > _response_cache_settings["ttl"]:
+            del _response_cache[key]
+            _response_cache_settings["bytes"] -= len(entry[1])
+            return None
+        _response_cache.move_to_end(key)
+        return entry[1]
+
+
+def _cache_store(key: Tuple[str, str], value: bytes) -> None:
+    """
+    Caches a value, evicting the least recently used entries beyond the count and size limits.
+    """
+    with _response_cache_lock:
+        if len(value) > _response_cache_settings["max_bytes"]:
+            return
+        previous = _response_cache.pop(key, None)
+        if previous is not None:
+            _response_cache_settings["bytes"] -= len(previous[1])
+        _response_cache[key] = (time.monotonic(), value)
+        _response_cache_settings["bytes"] += len(value)
+        while (
+            len(_response_cache) > _response_cache_settings["max_entries"]
+            or _response_cache_settings["bytes"] > _response_cache_settings["max_bytes"]
+        ):
+            _, (_, evicted) = _response_cache.popitem(last=False)
+            _response_cache_settings["bytes"] -= len(evicted)
+
+
+def _cached_get(url: str, headers: Dict[str, str] = None) -> requests.Response:
+    """
+    Performs a GET request, reusing the body of an earlier successful response for the same URL
+    and credentials while the response cache is enabled.
+
+    Args:
+        url (str): The URL to fetch.
+        headers (Dict[str, str], optional): Headers to send with the request.
+
+    Returns:
+        requests.Response: The response; cached responses are rebuilt with status code 200.
+    """
+    if not _response_cache_settings["enabled"]:
+        return requests.get(url, headers=headers)
+
+    authorization = (headers or {}).get("Authorization", "")
+    key = (url, hashlib.sha256(authorization.encode("utf-8")).hexdigest())
+    content = _cache_lookup(key)
+    if content is not None:
+        response = requests.Response()
+        response.status_code = 200
+        response._content = content
+        return response
+
+    response = requests.get(url, headers=headers)
+    if response.status_code == 200 and response.content:
+        _cache_store(key, response.content)
+    return response
+
 @tool("create pie plot")
 def create_pie_plot(
     data: List[float], 
@@ -34,16 +183,15 @@ def create_pie_plot(
     Returns:
         str: The path to the saved pie plot image.
     """
-    if not os.path.exists("./plots"):
-        os.makedirs("./plots")
-
-    plt.figure(figsize=(8, 8))
-    patches, _, _ = plt.pie(data, labels=labels, autopct='%1.1f%%', startangle=140)
-    plt.title(title)
-    plt.axis('equal')
-    plt.savefig(os.path.join("./plots", filename))
-    plt.close()
-    return os.path.join("./plots", filename)
+    plots_dir = get_plots_dir()
+    with _plot_lock:
+        plt.figure(figsize=(8, 8))
+        patches, _, _ = plt.pie(data, labels=labels, autopct='%1.1f%%', startangle=140)
+        plt.title(title)
+        plt.axis('equal')
+        _save_figure(os.path.join(plots_dir, filename))
+        plt.close()
+    return os.path.join(plots_dir, filename)
 
 @tool("create scatter plot")
 def create_scatter_plot(
@@ -68,19 +216,19 @@ def create_scatter_plot(
     Returns:
         str: The path to the saved scatter plot image.
     """
-    if not os.path.exists("./plots"):
-        os.makedirs("./plots")
-    plt.figure(figsize=(8, 6))
-    plt.scatter(x_data, y_data)
-    plt.title(title)
-    if xlabel:
-        plt.xlabel(xlabel)
-    if ylabel:
-        plt.ylabel(ylabel)
-    plt.grid(True)
-    plt.savefig(os.path.join("./plots", filename))
-    plt.close()
-    return os.path.join("./plots", filename)
+    plots_dir = get_plots_dir()
+    with _plot_lock:
+        plt.figure(figsize=(8, 6))
+        plt.scatter(x_data, y_data)
+        plt.title(title)
+        if xlabel:
+            plt.xlabel(xlabel)
+        if ylabel:
+            plt.ylabel(ylabel)
+        plt.grid(True)
+        _save_figure(os.path.join(plots_dir, filename))
+        plt.close()
+    return os.path.join(plots_dir, filename)
 
 @tool("create bar plot")
 def create_bar_plot(
@@ -105,19 +253,19 @@ def create_bar_plot(
     Returns:
         str: The path to the saved bar plot image.
     """
-    if not os.path.exists("./plots"):
-        os.makedirs("./plots")
-    fig, ax = plt.subplots(figsize=(10, 6))
-    ax.bar(x_labels, data)
-    ax.set_title(title)
-    if xlabel:
-        ax.set_xlabel(xlabel)
-    if ylabel:
-        ax.set_ylabel(ylabel)
-    plt.grid(True)
-    plt.savefig(os.path.join("./plots", filename))
-    plt.close()
-    return os.path.join("./plots", filename)
+    plots_dir = get_plots_dir()
+    with _plot_lock:
+        fig, ax = plt.subplots(figsize=(10, 6))
+        ax.bar(x_labels, data)
+        ax.set_title(title)
+        if xlabel:
+            ax.set_xlabel(xlabel)
+        if ylabel:
+            ax.set_ylabel(ylabel)
+        plt.grid(True)
+        _save_figure(os.path.join(plots_dir, filename))
+        plt.close()
+    return os.path.join(plots_dir, filename)
 
 @tool("create time series plot")
 def create_time_series_plot(
@@ -142,19 +290,19 @@ def create_time_series_plot(
     Returns:
         str: The path to the saved time series plot image.
     """
-    if not os.path.exists("./plots"):
-        os.makedirs("./plots")
-    plt.figure(figsize=(10, 6))
-    plt.plot(x_data, y_data)
-    plt.title(title)
-    if xlabel:
-        plt.xlabel(xlabel)
-    if ylabel:
-        plt.ylabel(ylabel)
-    plt.grid(True)
-    plt.savefig(os.path.join("./plots", filename))
-    plt.close()
-    return os.path.join("./plots", filename)
+    plots_dir = get_plots_dir()
+    with _plot_lock:
+        plt.figure(figsize=(10, 6))
+        plt.plot(x_data, y_data)
+        plt.title(title)
+        if xlabel:
+            plt.xlabel(xlabel)
+        if ylabel:
+            plt.ylabel(ylabel)
+        plt.grid(True)
+        _save_figure(os.path.join(plots_dir, filename))
+        plt.close()
+    return os.path.join(plots_dir, filename)
 
 @tool("create heat map")
 def create_heatmap(
@@ -181,36 +329,235 @@ def create_heatmap(
     Returns:
         str: The path to the saved heatmap image.
     """
-    if not os.path.exists("./plots"):
-        os.makedirs("./plots")
-    plt.figure(figsize=(10, 6))
-    plt.imshow(data, cmap='viridis', interpolation='nearest')
-    plt.colorbar()
-    plt.title(title)
-    if xlabel:
-        plt.xlabel(xlabel)
-    if ylabel:
-        plt.ylabel(ylabel)
-    plt.xticks(np.arange(len(x_labels)), x_labels)
-    plt.yticks(np.arange(len(y_labels)), y_labels)
-    plt.savefig(os.path.join("./plots", filename))
-    plt.close()
-    return os.path.join("./plots", filename)
+    plots_dir = get_plots_dir()
+    with _plot_lock:
+        plt.figure(figsize=(10, 6))
+        plt.imshow(data, cmap='viridis', interpolation='nearest')
+        plt.colorbar()
+        plt.title(title)
+        if xlabel:
+            plt.xlabel(xlabel)
+        if ylabel:
+            plt.ylabel(ylabel)
+        plt.xticks(np.arange(len(x_labels)), x_labels)
+        plt.yticks(np.arange(len(y_labels)), y_labels)
+        _save_figure(os.path.join(plots_dir, filename))
+        plt.close()
+    return os.path.join(plots_dir, filename)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_HTML_BLOCK_RE = re.compile(r"<(script|style|nav|header|footer|aside|form|noscript)\b.*?</\1>", re.IGNORECASE | re.DOTALL)
+_HTML_TAG_RE = re.compile(r"<[^>]+>")
+_MARKDOWN_IMAGE_RE = re.compile(r"!\[[^\]]*\]\([^)]*\)")
+_MARKDOWN_LINK_RE = re.compile(r"\[([^\]]*)\]\([^)]*\)")
+_FENCE_RE = re.compile(r"^\s{0,3}(`{3,}|~{3,})")
+_FENCE_LINE_RE = re.compile(r"^\s{0,3}(?:`{3,}|~{3,})", re.MULTILINE)
+_LIST_ITEM_RE = re.compile(r"^([-*+]|\d+[.)])\s+")
+_BOILERPLATE_WORDS = ("cookie", "privacy policy", "terms of service", "subscribe", "sign up", "log in", "all rights reserved")
+
+# Average number of characters per LLM token, used to turn token budgets into character budgets.
+CHARS_PER_TOKEN = 4
+WEB_SEARCH_MAX_CHARS = int(os.getenv("WEB_SEARCH_MAX_CHARS", "6000"))
+
+
+def _is_navigation(line: str, text: str) -> bool:
+    """
+    Tells whether a short line looks like a menu entry, breadcrumb or separator rather than content.
+    """
+    if len(text.split()) >= 4 or text.startswith(("#", "Title:", "URL Source:")):
+        return False
+    return _MARKDOWN_LINK_RE.search(line) is not None or not re.search(r"[A-Za-z]{2}", text)
+
+
+def strip_boilerplate(content: str) -> str:
+    """
+    Removes markup, images, navigation and other boilerplate lines from a fetched page.
+
+    Fenced code blocks are kept verbatim, and list items and table rows are never
+    dropped for being short or link-heavy.
+
+    Args:
+        content (str): The page content returned by the Jina AI Reader (Markdown or HTML).
+
+    Returns:
+        str: The remaining content, with blank lines separating blocks.
+    """
+    if content.lstrip().startswith("<"):
+        content = _HTML_BLOCK_RE.sub(" ", content)
+        content = re.sub(r"<li\b[^>]*>", "\n- ", content, flags=re.IGNORECASE)
+        content = re.sub(r"</(p|div|li|h[1-6]|tr|br)\s*>", "\n\n", content, flags=re.IGNORECASE)
+        content = _HTML_TAG_RE.sub(" ", content)
+    content = _MARKDOWN_IMAGE_RE.sub("", content)
+
+    lines: List[str] = []
+    fence = None
+    for line in content.splitlines():
+        marker = _FENCE_RE.match(line)
+        if fence is not None:
+            lines.append(line)
+            if marker and marker.group(1)[0] == fence[0] and len(marker.group(1)) >= len(fence):
+                fence = None
+            continue
+        if marker:
+            fence = marker.group(1)
+            lines.append(line)
+            continue
+
+        text = _MARKDOWN_LINK_RE.sub(r"\1", line).strip()
+        is_notice = len(text) < 200 and any(word in text.lower() for word in _BOILERPLATE_WORDS)
+        if _LIST_ITEM_RE.match(text) or text.startswith("|"):
+            keep = not is_notice
+        else:
+            # Menus and link lists rarely carry content.
+            is_link_list = len(line.strip()) > 2 * len(text) + 20
+            keep = not (is_link_list or is_notice or _is_navigation(line, text))
+        text = text if keep else ""
+        # Collapse runs of blank lines outside code blocks.
+        if text or (lines and lines[-1]):
+            lines.append(text)
+    return "\n".join(lines).strip()
+
+
+def split_passages(text: str, target_chars: int = 600) -> List[str]:
+    """
+    Splits text into passages of roughly `target_chars` characters along block boundaries.
+
+    A fenced code block is never split across passages.
+
+    Args:
+        text (str): The text to split.
+        target_chars (int): The approximate passage size. Default is 600.
+
+    Returns:
+        List[str]: The passages in document order.
+    """
+    blocks: List[str] = []
+    open_block = ""
+    for block in re.split(r"\n\s*\n", text):
+        # Blank lines inside a fenced code block do not end it.
+        block = f"{open_block}\n\n{block}" if open_block else block
+        if len(_FENCE_LINE_RE.findall(block)) % 2:
+            open_block = block
+            continue
+        open_block = ""
+        blocks.append(block)
+    if open_block:
+        blocks.append(open_block)
+
+    passages: List[str] = []
+    current = ""
+    for block in blocks:
+        block = block.strip()
+        if not block:
+            continue
+        # Oversized prose blocks are cut at sentence boundaries.
+        is_code = _FENCE_RE.match(block) is not None
+        pieces = re.split(r"(?<=[.!?])\s+", block) if len(block) > 2 * target_chars and not is_code else [block]
+        for piece in pieces:
+            if current and len(current) + len(piece) > target_chars:
+                passages.append(current)
+                current = ""
+            current = f"{current}\n{piece}" if current else piece
+    if current:
+        passages.append(current)
+    return passages
+
+
+def score_passages(passages: List[str], query: str, k1: float = 1.5, b: float = 0.75) -> np.ndarray:
+    """
+    Scores passages against a query with BM25, computed over a passage-by-term count matrix.
+
+    Args:
+        passages (List[str]): The passages to score.
+        query (str): The search query.
+        k1 (float): BM25 term-frequency saturation. Default is 1.5.
+        b (float): BM25 length normalisation. Default is 0.75.
+
+    Returns:
+        np.ndarray: One score per passage.
+    """
+    terms = {term: index for index, term in enumerate(dict.fromkeys(_TOKEN_RE.findall(query.lower())))}
+    if not passages or not terms:
+        return np.zeros(len(passages))
+
+    tokenized = [_TOKEN_RE.findall(passage.lower()) for passage in passages]
+    lengths = np.array([len(tokens) for tokens in tokenized], dtype=float)
+    passage_ids = np.repeat(np.arange(len(passages)), lengths.astype(int))
+    term_ids = np.array([terms.get(token, -1) for tokens in tokenized for token in tokens], dtype=int)
+    matched = term_ids >= 0
+
+    tf = np.zeros((len(passages), len(terms)))
+    np.add.at(tf, (passage_ids[matched], term_ids[matched]), 1)
+
+    df = np.count_nonzero(tf, axis=0)
+    idf = np.log1p((len(passages) - df + 0.5) / (df + 0.5))
+    norm = k1 * (1 - b + b * lengths / max(lengths.mean(), 1.0))
+    return ((tf * (k1 + 1)) / (tf + norm[:, None]) * idf).sum(axis=1)
+
+
+def extract_relevant_content(
+    content: str,
+    query: str,
+    max_chars: int = WEB_SEARCH_MAX_CHARS,
+    max_tokens: int = None
+    ) -> str:
+    """
+    Keeps only the passages of a page most relevant to the query, within a size budget.
+
+    Args:
+        content (str): The full page content.
+        query (str): The search query the passages are scored against.
+        max_chars (int): The maximum number of characters to return. Default is WEB_SEARCH_MAX_CHARS.
+        max_tokens (int, optional): The maximum number of tokens to return, estimated at
+            CHARS_PER_TOKEN characters per token. Applied on top of `max_chars`.
+
+    Returns:
+        str: The selected passages in document order, separated by "[...]" where text was dropped.
+    """
+    if max_tokens:
+        max_chars = min(max_chars, max_tokens * CHARS_PER_TOKEN)
+    passages = split_passages(strip_boilerplate(content))
+    scores = score_passages(passages, query)
+
+    selected = []
+    used = 0
+    for index in np.argsort(-scores, kind="stable"):
+        if scores[index] <= 0 and selected:
+            break
+        passage = passages[index]
+        if used + len(passage) > max_chars:
+            if selected:
+                continue
+            passage = passage[:max_chars]
+        selected.append(index)
+        used += len(passage) + 2
+
+    output = []
+    previous = -1
+    for index in sorted(selected):
+        if previous >= 0 and index != previous + 1:
+            output.append("[...]")
+        output.append(passages[index][:max_chars])
+        previous = index
+    return "\n\n".join(output)
+
 
 @tool("web search")
-def perform_web_search(query: str) -> str:
+def perform_web_search(query: str, full_page: bool = False) -> str:
     """
     Perform a web search using Jina AI's Reader and Searcher tools.
 
     This function performs a web search for the given query using the Jina AI Searcher API.
-    It fetches the top search result and retrieves the content from the URL using the
-    Jina AI Reader API, returning the raw content from the URL with resized images.
+    It fetches the top search result, retrieves the content from the URL using the
+    Jina AI Reader API and returns only the passages most relevant to the query.
+    Set `full_page` to True to get the complete page instead.
 
     Args:
         query (str): The search query.
+        full_page (bool): Return the whole page rather than the relevant passages. Default is False.
 
     Returns:
-        str: Content of the top search result with resized images.
+        str: The most relevant passages of the top search result, or its full content.
     """
     reader_base_url = "https://r.jina.ai/"
     searcher_base_url = "https://s.jina.ai/"
@@ -220,7 +567,7 @@ def perform_web_search(query: str) -> str:
         search_url = f"{searcher_base_url}{encoded_query}"
         
         headers = {"Authorization": f"Bearer {api_key}"}
-        search_response = requests.get(search_url, headers=headers)
+        search_response = _cached_get(search_url, headers=headers)
         
         if search_response.status_code == 402:
             logging.error("Search request failed with status code 402: Payment required. Check your API key and subscription.")
@@ -246,15 +593,21 @@ def perform_web_search(query: str) -> str:
 
         try:
             reader_url = f"{reader_base_url}{top_result_url}"
-            reader_response = requests.get(reader_url, headers=headers)
+            reader_response = _cached_get(reader_url, headers=headers)
             if reader_response.status_code == 200:
                 content = reader_response.text
                 if content:
-                    # Parse HTML content and resize images
-                    soup = BeautifulSoup(content, 'html.parser')
-                    for img in soup.find_all('img'):
-                        img['style'] = 'max-width:100%;height:auto;'
-                    return str(soup)
+                    if full_page:
+                        return content
+                    extracted = extract_relevant_content(content, query)
+                    if not extracted:
+                        # Nothing survived extraction; hand over the start of the page rather than nothing.
+                        extracted = (
+                            f"{content[:WEB_SEARCH_MAX_CHARS]}\n\n"
+                            "[No passages matched the query; this is the start of the page. "
+                            "Search again with full_page=True to get the whole page.]"
+                        )
+                    return f"Source: {top_result_url}\n\n{extracted}"
                 else:
                     logging.error(f"Empty content fetched from {top_result_url}")
                     return "Error: Empty content fetched from the URL."
@@ -338,17 +691,23 @@ def download_and_extract_pdf(
     Returns:
         str: The extracted text from the PDF.
     """
+    # Only the extracted text is cached: the PDFs themselves are often several MB.
+    key = (f"{url}#text-pages={max_pages}", "")
+    if _response_cache_settings["enabled"]:
+        cached = _cache_lookup(key)
+        if cached is not None:
+            return cached.decode("utf-8")
+
     response = requests.get(url)
-    filename = 'temp.pdf'
-    with open(filename, 'wb') as f:
-        f.write(response.content)
-    
+
     text = ""
-    with fitz.open(filename) as doc:
+    with fitz.open(stream=response.content, filetype="pdf") as doc:
         for page_num in range(min(max_pages, doc.page_count)):
             page = doc.load_page(page_num)
             text += page.get_text()
-    
+
+    if _response_cache_settings["enabled"] and text:
+        _cache_store(key, text.encode("utf-8"))
     return text
 
 client = arxiv.Client()
@@ -408,3 +767,66 @@ def search_arxiv(query: str) -> str:
         markdown_output += "---\n\n"
     
     return markdown_output
+
+
+def make_benchmark_tool(df: pd.DataFrame):
+    """
+    Creates a tool that benchmarks baseline models on the user's DataFrame.
+
+    Args:
+        df (pd.DataFrame): The dataset provided by the user.
+
+    Returns:
+        The "benchmark baseline models" tool bound to `df`.
+    """
+    @tool("benchmark baseline models")
+    def benchmark_baseline_models(target_column: str, task_type: str = "auto") -> str:
+        """
+        Trains lightweight baseline models (linear model, decision tree, random forest and
+        gradient boosting) on a stratified subsample of the user's data and measures them.
+
+        Args:
+            target_column (str): The name of the column to predict.
+            task_type (str): "classification", "regression" or "auto" to infer it from the target.
+
+        Returns:
+            str: A Markdown table of cross-validated score, fit time and prediction throughput per model.
+        """
+        return benchmark_dataframe(df, target_column, task_type)
+
+    return benchmark_baseline_models
+
+
+def make_code_execution_tool(df: pd.DataFrame, file_name: str = "data.csv", sample_rows: int = 5000):
+    """
+    Creates a tool that runs and profiles generated code against samples of the user's data.
+
+    Args:
+        df (pd.DataFrame): The dataset provided by the user.
+        file_name (str): The name of the uploaded file, which generated code usually reads. Default is "data.csv".
+        sample_rows (int): The number of rows of the larger sample. Default is 5000.
+
+    Returns:
+        The "execute and profile python code" tool bound to `df`.
+    """
+    file_names = tuple(dict.fromkeys([os.path.basename(file_name), "data.csv"]))
+    sample_sizes = sorted({min(len(df), sample_rows // 10), min(len(df), sample_rows)})
+
+    @tool("execute and profile python code")
+    def execute_and_profile_code(code: str) -> str:
+        """
+        Runs Python code in an isolated sandbox against a small and a larger sample of the user's
+        data (readable as the uploaded file name or "data.csv") with CPU, memory and time limits.
+        Fenced ```python blocks are joined into one program.
+
+        Args:
+            code (str): The Python code, or Markdown containing ```python blocks.
+
+        Returns:
+            str: For each sample size, any exception, the wall time, the peak memory and the hottest functions.
+        """
+        program = extract_code(code)
+        results = run_snippets([(program, rows) for rows in sample_sizes], df, file_names)
+        return format_report(results)
+
+    return execute_and_profile_code